@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime as dt
 import pandas as pd
 
@@ -9,18 +10,52 @@ from src.RentalListingMap import RentalListingMap
 from src.RentalSummaryStats import RentalSummaryStats
 from src.NearbyRentalListings import NearbyRentalListings
 from src.RentalAnalytics import RentalAnalytics
+from src.RentalTrends import RentalTrends
+from src.RentalDataStore import RentalDataStore
+from src.ComparableListings import ComparableListings
+from src.FairRentModel import FairRentModel
 from src.CraigslistRentalListingsScraper import CraigslistRentalListingsScraper
 
 st.set_option('deprecation.showPyplotGlobalUse', False)
 
 # Constants
 DATA_FILE_PATH = "Data/CraigsList_Rental_Listings.csv"
+MODEL_DIR = "Models"
 MAPBOX_TOKEN = "YOUR_MAPBOX_TOKEN"  
+MAP_ZOOM = 12
+COMPARABLES_COUNT = 20
+
+@st.cache_resource
+def get_data_store():
+    # One listings DataFrame per server process, shared by every session
+    return RentalDataStore(DATA_FILE_PATH)
+
+@st.cache_resource
+def get_rental_trends():
+    # One trend engine per server process, updated incrementally as listings are appended
+    return RentalTrends()
+
+@st.cache_resource
+def get_comparable_listings():
+    # One comparables index per server process, updated incrementally as listings are appended
+    return ComparableListings()
+
+@st.cache_resource(max_entries=1)
+def get_fair_rent_model(version):
+    # Trained offline by train_fair_rent_model.py and loaded once per version, so a
+    # newly trained model is picked up on the next run without restarting the app
+    return FairRentModel.load(MODEL_DIR, version)
+
+@st.cache_data
+def geocode_address(address):
+    return PropertyFinder.property_longitude_latitude(address)
 
 def user_input_sidebar():
     with st.sidebar.form(key='input_form'):
         property_address = st.text_input("Enter Zipcode", value="94608")
         bedroom = st.slider("Number of Bedrooms", min_value=0,  max_value=5, value=2)
+        bathroom = st.slider("Number of Bathrooms", min_value=1, max_value=4, value=1)
+        sqft = st.number_input("Square Footage (0 if unknown)", min_value=0, value=0, step=50)
         total_listings = st.slider("Number of Rental Listings", min_value=1, max_value=10, value=5)
 
         estimated_rent = st.number_input("Estimated Rent", min_value=0, value=2500, step=100)
@@ -40,6 +75,8 @@ def user_input_sidebar():
         'miles': miles,
         'total_listings':total_listings,
         'bedroom': bedroom,
+        'bathroom': bathroom,
+        'sqft': sqft,
         'estimated_rent': estimated_rent,
         'query_date': query_date,
         'query_date_prior': query_date_prior,
@@ -67,11 +104,14 @@ def main():
             st.write(""" # Rental Property Finder """)
         
             #display_user_input(property_details)
-            df_properties = pd.read_csv(DATA_FILE_PATH)
+            df_properties = get_data_store().get_df()
 
             # Display Summary Stats 
             display_rental_stats( property_details)
 
+            # Display the model's fair rent estimate
+            display_fair_rent(property_details)
+
             # Top-level columns
             col1, col2 = st.columns(2)
 
@@ -82,9 +122,9 @@ def main():
 
             with col2:
                 # Display Nearby Properties Map
-                display_rental_map(df_properties, property_details)
+                display_rental_map(property_details)
 
-            st.write(""" # Current Rental Listings """)
+            st.write(""" # Comparable Rental Listings """)
 
             # Display listings that match user criteria
             display_nearby_rental_listings(property_details)
@@ -100,6 +140,9 @@ def main():
             # Display price boxplot 
             display_plot_price_by_bedroom_boxplot(property_details)
 
+            # Display weekly market trends
+            display_market_trends(property_details)
+
 
     else:
         st.write(""" # Are you paying too much in rent?""")
@@ -113,7 +156,7 @@ def display_user_input(details):
     st.write(f"Estimated Rent: ${details['estimated_rent']}")
 
 def display_gauge_chart(df_properties, details):
-    gauge_chart = GaugeChart(DATA_FILE_PATH)
+    gauge_chart = GaugeChart(DATA_FILE_PATH, df=df_properties)
     gauge_chart.get_chart(
         zipcode=details['zipcode'],
         bedroom=details['bedroom'],
@@ -123,19 +166,25 @@ def display_gauge_chart(df_properties, details):
     )
 
 
-def display_rental_map(df_properties, details):
-    property_finder = PropertyFinder(df_properties, details['property_address'])
-    nearby_properties, target_lon, target_lat = property_finder.find_within_radius(details['miles'])
-    nearby_properties_df = nearby_properties[[ 'Address','Longitude', 'Latitude']]
+@st.cache_data(max_entries=32)
+def get_map_clusters(data_version, target_lon, target_lat, zoom):
+    # Cached per dataset version and viewport; `data_version` only keys the cache, and
+    # the bound evicts entries for superseded versions as new listings are appended
+    df_properties = get_data_store().get_df()
+    return RentalListingMap.cluster_listings(df_properties, target_lon, target_lat, zoom=zoom)
+
+def display_rental_map(details):
+    target_lon, target_lat = geocode_address(details['property_address'])
+    clusters = get_map_clusters(get_data_store().version(), target_lon, target_lat, MAP_ZOOM)
 
     rental_map = RentalListingMap(MAPBOX_TOKEN)
-    rental_map.render_map(nearby_properties_df, target_lon=target_lon, target_lat=target_lat)
+    rental_map.render_map(clusters, target_lon=target_lon, target_lat=target_lat, zoom=MAP_ZOOM)
 
 
 def display_rental_stats( details):
 
     # Initialize the class with the path to the data file
-    rental_stats = RentalSummaryStats(DATA_FILE_PATH,  current_rent=details['estimated_rent'])
+    rental_stats = RentalSummaryStats(DATA_FILE_PATH,  current_rent=details['estimated_rent'], df=get_data_store().get_df())
     # Display the summary stats table with the corresponding filters in Streamlit
     rental_stats.display_summary_stats(
                         zipcode=details['zipcode'],
@@ -144,16 +193,39 @@ def display_rental_stats( details):
                         query_date=details['query_date']
     )
 
-def display_nearby_rental_listings(details):
-    # Instantiate the class with the path to the data file and the user's current rent
-    rental_listings = NearbyRentalListings(DATA_FILE_PATH, current_rent=details['estimated_rent'])
+def display_fair_rent(details):
+    try:
+        model = get_fair_rent_model(FairRentModel.latest_version(MODEL_DIR))
+    except FileNotFoundError:
+        st.write("No fair rent model has been trained yet. Run `python train_fair_rent_model.py`.")
+        return
+
+    estimate = model.predict(
+        zipcodes=[details['zipcode']],
+        bedrooms=[details['bedroom']],
+        bathrooms=[details['bathroom']],
+        sqft=[details['sqft'] or np.nan]
+    ).iloc[0]
+
+    summary = f"The estimated fair rent is \${estimate['Fair_Rent']:,.0f} "
+    summary += f"(80% range \${estimate['Lower']:,.0f} to \${estimate['Upper']:,.0f}), "
+    summary += f"based on {estimate['Supporting_Listings']:,.0f} listings with this zipcode and bedroom count "
+    summary += "and the wider market."
+    st.write(summary)
 
-    # Get the nearby rental properties
-    nearby_properties = rental_listings.get_nearby_properties(
-            zipcode=details['zipcode'],
+def display_nearby_rental_listings(details):
+    target_lon, target_lat = geocode_address(details['property_address'])
+    comparable_listings = get_comparable_listings()
+    comparable_listings.update_from_csv(DATA_FILE_PATH)
+
+    # Get the best comparables by location, size, bedrooms, bathrooms and recency
+    nearby_properties = comparable_listings.get_comparables(
+            longitude=target_lon,
+            latitude=target_lat,
             bedroom=details['bedroom'],
-            query_date_prior=details['query_date_prior'],
-            query_date=details['query_date']
+            bathroom=details['bathroom'],
+            sqft=details['sqft'] or None,
+            k=COMPARABLES_COUNT
     )
 
     # Display the rental properties with clickable URLs, which requires using Streamlit to write the DataFrame as HTML
@@ -165,7 +237,7 @@ def display_nearby_rental_listings(details):
 
 def display_plot_price_with_regression(details):
 
-    rental_analytics = RentalAnalytics(DATA_FILE_PATH)
+    rental_analytics = RentalAnalytics(DATA_FILE_PATH, trends=get_rental_trends(), df=get_data_store().get_df())
     # Plotting
     # st.title('Rental Price Analysis')
 
@@ -178,7 +250,7 @@ def display_plot_price_with_regression(details):
     st.pyplot(fig)
 
 def display_plot_price_by_bedroom_boxplot(details):
-    rental_analytics = RentalAnalytics(DATA_FILE_PATH)
+    rental_analytics = RentalAnalytics(DATA_FILE_PATH, trends=get_rental_trends(), df=get_data_store().get_df())
     # Plotting
     st.subheader('Price Boxplot')
     fig = rental_analytics.plot_price_by_bedroom_boxplot(
@@ -189,6 +261,15 @@ def display_plot_price_by_bedroom_boxplot(details):
     st.pyplot(fig)
 
 
+def display_market_trends(details):
+    rental_analytics = RentalAnalytics(DATA_FILE_PATH, trends=get_rental_trends(), df=get_data_store().get_df())
+    st.subheader('Market Trends')
+    fig = rental_analytics.plot_market_trends(
+                    zipcode=details['zipcode'],
+                    bedroom=details['bedroom'])
+    st.pyplot(fig)
+
+
 #     # Generate plots
 #     st.plot(rental_analytics.plot_price_with_regression(df_filtered))
 # rental_analytics.plot_price_by_bedroom_boxplot(df_filtered)
@@ -0,0 +1,97 @@
+"""
+Check that the incremental trend engine matches a direct groupby over the listings CSV.
+
+The CSV is fed to the engine in random-sized chunks, once in file order and once
+shuffled, and every (zip, bedroom) trend is compared with weekly stats computed from
+the whole file at once. Listing counts and days on market must not depend on the order
+rows arrive in; prices are compared on the in-order run, where the engine and the
+groupby keep the same observation of a listing re-scraped within a week.
+
+Usage:
+    python check_trends.py
+    python check_trends.py --chunks 50 --seed 7
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.RentalTrends import RentalTrends
+
+DATA_FILE_PATH = "Data/CraigsList_Rental_Listings.csv"
+
+
+def expected_trends(df):
+    # Weekly stats per (zip, bedroom) straight from the full history
+    df = df[['Listing_URL', 'Query_Zip_Code', 'Bedroom', 'Price', 'Query_Date']].copy()
+    df['Query_Zip_Code'] = df['Query_Zip_Code'].astype(str)
+    df['Price'] = pd.to_numeric(df['Price'], errors='coerce')
+    df['Bedroom'] = pd.to_numeric(df['Bedroom'], errors='coerce')
+    df['Query_Date'] = RentalTrends.parse_query_dates(df['Query_Date'])
+    df = df.dropna(subset=['Bedroom', 'Query_Date'])
+    df['Bedroom'] = df['Bedroom'].astype(int)
+    df['Week'] = df['Query_Date'].dt.to_period('W').dt.start_time
+
+    listings = df.groupby(['Query_Zip_Code', 'Bedroom', 'Listing_URL'])['Query_Date'].agg(['min', 'max'])
+    listings['Days'] = (listings['max'] - listings['min']).dt.days
+    listings['Week'] = listings['min'].dt.to_period('W').dt.start_time
+    days_on_market = listings.groupby(['Query_Zip_Code', 'Bedroom', 'Week'])['Days'].median()
+
+    weekly = (df.drop_duplicates(subset=['Listing_URL', 'Query_Zip_Code', 'Bedroom', 'Week'])
+              .groupby(RentalTrends.GROUP_KEYS)
+              .agg(Listings=('Listing_URL', 'size'),
+                   Median_Price=('Price', 'median'),
+                   Mean_Price=('Price', 'mean')))
+    weekly['Median_Days_On_Market'] = days_on_market
+    return weekly
+
+
+def feed(df, chunks, rng):
+    # Split the rows at random points so buckets and listings straddle batches
+    trends = RentalTrends()
+    cuts = np.sort(rng.choice(np.arange(1, len(df)), size=chunks - 1, replace=False))
+    for batch in np.split(np.arange(len(df)), cuts):
+        trends.update(df.iloc[batch])
+    return trends
+
+
+def compare(trends, expected, columns):
+    # Return a description of every (zip, bedroom, week, column) that disagrees
+    mismatches = []
+    for (zipcode, bedroom), weeks in expected.groupby(level=['Query_Zip_Code', 'Bedroom']):
+        weeks = weeks.droplevel(['Query_Zip_Code', 'Bedroom'])
+        actual = trends.get_trends(zipcode, bedroom).reindex(weeks.index)
+        for col in columns:
+            if not np.allclose(actual[col].astype(float), weeks[col].astype(float), equal_nan=True):
+                mismatches.append(f"{zipcode}/{bedroom}BR {col}: "
+                                  f"engine {actual[col].sum():g}, groupby {weeks[col].sum():g}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_FILE_PATH, help='Listings CSV to check against.')
+    parser.add_argument('--chunks', type=int, default=20, help='Number of batches to feed the engine.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    df = pd.read_csv(args.data)
+    expected = expected_trends(df)
+
+    in_order = feed(df, args.chunks, rng)
+    mismatches = compare(in_order, expected,
+                         ['Listings', 'Median_Price', 'Mean_Price', 'Median_Days_On_Market'])
+    shuffled = feed(df.sample(frac=1, random_state=args.seed), args.chunks, rng)
+    mismatches += [f"shuffled {m}" for m in compare(shuffled, expected, ['Listings', 'Median_Days_On_Market'])]
+
+    groups = expected.index.droplevel('Week').nunique()
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"Checked {groups} ZIP code / bedroom trends: {len(mismatches)} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
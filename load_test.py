@@ -0,0 +1,143 @@
+"""
+Simulate concurrent app sessions against the listings data and report throughput and memory.
+
+Each simulated session does the data work behind one Submit: it appends a scraped
+batch to the CSV, then computes the summary stats, comparable listings, market trends
+and map clusters. Rendering is skipped so only the data layer is measured.
+
+Usage:
+    python load_test.py --sessions 20 --workers 8
+    python load_test.py --sessions 20 --workers 8 --per-session   # old behaviour: every session reads its own copy
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.RentalDataStore import RentalDataStore
+from src.RentalSummaryStats import RentalSummaryStats
+from src.ComparableListings import ComparableListings
+from src.RentalAnalytics import RentalAnalytics
+from src.RentalTrends import RentalTrends
+from src.RentalListingMap import RentalListingMap
+from src.CraigslistRentalListingsScraper import CraigslistRentalListingsScraper
+
+DATA_FILE_PATH = "Data/CraigsList_Rental_Listings.csv"
+
+
+def housing_text(row):
+    # Rebuild the scraper's housing bubbles, e.g. "2BR / 1.5Ba 850ft2", leaving out unknown values
+    bubbles = []
+    if pd.notna(row['Bedroom']):
+        bubbles.append(f"{row['Bedroom']:.0f}BR")
+    if pd.notna(row['Bathroom']):
+        bubbles.append(f"{row['Bathroom']:g}Ba")
+    if pd.notna(row['Sqft']):
+        bubbles.append(f"{row['Sqft']:.0f}ft2")
+    return ' / '.join(bubbles)
+
+
+def sample_batch(df, zipcode, bedroom, size):
+    # Re-emit existing listings as raw scraper output so ingest goes through the real save path
+    rows = df[(df['Query_Zip_Code'].astype(str) == zipcode) & (df['Bedroom'] == bedroom)
+              & df['Price'].notna()].head(size)
+    return [{
+        "Listing_URL": row['Listing_URL'],
+        "Address": row['Address'],
+        "Price": f"${row['Price']:.0f}",
+        "Housing": housing_text(row),
+        "Query_Zip_Code": zipcode,
+        "Query_Miles": row['Query_Miles'],
+        "Longitude": row['Longitude'],
+        "Latitude": row['Latitude'],
+        "Query_Date": pd.Timestamp.now().strftime("%Y-%m-%d"),
+    } for _, row in rows.iterrows()]
+
+
+def run_session(data_file_path, store, trends, comparables, details, batch, per_session):
+    """
+    Run the data work of one Submit and return its latency in seconds.
+    """
+    start = time.perf_counter()
+
+    scraper = CraigslistRentalListingsScraper(details['zipcode'], 1, details['bedroom'], len(batch))
+    scraper.listings_data = list(batch)
+    scraper.save_to_csv(data_file_path)
+
+    df = None if per_session else store.get_df()
+    RentalSummaryStats(data_file_path, details['estimated_rent'], df=df).get_summary_stats(
+        details['zipcode'], details['bedroom'], details['query_date_prior'], details['query_date'])
+    if per_session:
+        comparables = ComparableListings(pd.read_csv(data_file_path))
+    else:
+        comparables.update_from_csv(data_file_path)
+    comparables.get_comparables(-122.28, 37.83, bedroom=details['bedroom'], bathroom=1, k=20)
+    RentalAnalytics(data_file_path, trends=None if per_session else trends, df=df).get_market_trends(
+        details['zipcode'], details['bedroom'])
+    map_df = df if df is not None else pd.read_csv(data_file_path)
+    RentalListingMap.cluster_listings(map_df, -122.28, 37.83, zoom=12)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=20, help='Total number of simulated sessions.')
+    parser.add_argument('--workers', type=int, default=8, help='Number of sessions running concurrently.')
+    parser.add_argument('--batch-size', type=int, default=5, help='Listings appended by each session.')
+    parser.add_argument('--zipcode', default='94608')
+    parser.add_argument('--bedroom', type=int, default=2)
+    parser.add_argument('--per-session', action='store_true',
+                        help='Give every session its own DataFrame and trend engine instead of the shared ones.')
+    args = parser.parse_args()
+
+    # Work on a scratch copy so the real listings file is never touched
+    scratch_dir = tempfile.mkdtemp()
+    data_file_path = os.path.join(scratch_dir, os.path.basename(DATA_FILE_PATH))
+    shutil.copy(DATA_FILE_PATH, data_file_path)
+    rows_before = len(pd.read_csv(data_file_path))
+
+    store = RentalDataStore(data_file_path)
+    trends = RentalTrends()
+    comparables = ComparableListings()
+    batch = sample_batch(store.get_df(), args.zipcode, args.bedroom, args.batch_size)
+    details = {
+        'zipcode': args.zipcode,
+        'bedroom': args.bedroom,
+        'estimated_rent': 2500,
+        'query_date_prior': (pd.Timestamp.now() - pd.Timedelta(days=7)).strftime("%Y-%m-%d"),
+        'query_date': pd.Timestamp.now().strftime("%Y-%m-%d"),
+    }
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(run_session, data_file_path, store, trends, comparables, details, batch, args.per_session)
+            for _ in range(args.sessions)
+        ]
+        latencies = sorted(future.result() for future in futures)
+    elapsed = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows_after = len(pd.read_csv(data_file_path))
+    shutil.rmtree(scratch_dir)
+
+    print(f"Mode:               {'per-session' if args.per_session else 'shared'}")
+    print(f"Sessions / workers: {args.sessions} / {args.workers}")
+    print(f"Throughput:         {args.sessions / elapsed:.2f} sessions/s")
+    print(f"Latency p50 / p95:  {statistics.median(latencies) * 1000:.0f} ms / "
+          f"{latencies[int(0.95 * (len(latencies) - 1))] * 1000:.0f} ms")
+    print(f"Peak traced memory: {peak_bytes / 1024 ** 2:.1f} MiB")
+    print(f"Rows appended:      {rows_after - rows_before} (expected {args.sessions * len(batch)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.RentalDataStore import file_lock, read_csv_tail
+from src.RentalTrends import RentalTrends
+
+class ComparableListings:
+    """
+    Scores listings as comparables for a target property by a weighted distance
+    over location, square footage, bedrooms, bathrooms and recency.
+
+    The feature matrix is sorted by east-west position, so a query only scores
+    listings inside a bounding box around the target rather than the whole history.
+    The box is widened until no listing outside it could beat the k-th best score,
+    so the result is the exact top k. Newly appended listings are merged into the
+    sorted matrix as they land rather than rebuilding it from the whole history.
+    """
+
+    KM_PER_MILE = 1.60934
+    KM_PER_DEGREE_LAT = 110.574
+    KM_PER_DEGREE_LON = 111.320
+
+    # Difference in each feature that counts as one unit of distance
+    SCALES = {
+        'Location': KM_PER_MILE,
+        'Sqft': 250.0,
+        'Bedroom': 1.0,
+        'Bathroom': 1.0,
+        'Recency': 14.0,  # days
+    }
+    DEFAULT_WEIGHTS = {
+        'Location': 1.0,
+        'Sqft': 1.0,
+        'Bedroom': 2.0,
+        'Bathroom': 0.5,
+        'Recency': 0.5,
+    }
+    # Scaled distance charged for a feature the listing is missing
+    MISSING_PENALTY = 1.0
+
+    OUTPUT_COLUMNS = ['Listing_URL', 'Address', 'Bedroom', 'Bathroom', 'Sqft', 'Price', 'Query_Date']
+    # Listings agreeing on all of these are reposts of the same unit
+    UNIT_COLUMNS = ['Address', 'Bedroom', 'Bathroom', 'Sqft', 'Price', 'Longitude', 'Latitude']
+    # Stored batches are compacted into one once there are this many
+    MAX_BATCHES = 64
+
+    def __init__(self, df=None, weights=None):
+        """
+        Build the feature matrix and spatial index from the listings history.
+
+        Args:
+        - df (pd.DataFrame, optional): Listings with location, size, price and Query_Date
+          columns. Leave out to start empty and fill the index with `update_from_csv`.
+        - weights (dict, optional): Overrides for DEFAULT_WEIGHTS.
+        """
+        self.weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+        # Guards the index when one instance is shared by concurrent sessions
+        self._lock = threading.RLock()
+        self._csv_offset = 0
+
+        # Set from the first batch; the local projection stays fixed after that
+        self.reference_lat = None
+        self.km_per_degree_lon = None
+
+        # Output rows in arrival order, one frame per appended batch, addressed by row id
+        self._batches = []
+        self._batch_starts = []
+        self._row_count = 0
+
+        # Parallel arrays, one entry per indexed listing, sorted by x_km
+        self.row_id = np.empty(0, dtype=np.int64)
+        self.x_km = np.empty(0)
+        self.y_km = np.empty(0)
+        self.sqft = np.empty(0)
+        self.bedroom = np.empty(0)
+        self.bathroom = np.empty(0)
+        self.day = np.empty(0)  # Query_Date in days since the epoch
+        self.url_key = np.empty(0, dtype=np.uint64)
+        self.unit_key = np.empty(0, dtype=np.uint64)
+        self.y_min = self.y_max = 0.0
+        self.newest_day = np.nan
+
+        if df is not None:
+            self.append(df)
+
+    @classmethod
+    def _prepare(cls, df):
+        """
+        Type a batch of listing rows in date order and flag the ones no later row in
+        the batch supersedes.
+        """
+        listings = df.copy()
+        listings['Parsed_Date'] = RentalTrends.parse_query_dates(listings['Query_Date'])
+        for col in ['Longitude', 'Latitude', 'Sqft', 'Bedroom', 'Bathroom', 'Price']:
+            listings[col] = pd.to_numeric(listings[col], errors='coerce').astype(float)
+        listings = listings.sort_values('Parsed_Date', kind='stable')
+
+        # An observation is superseded by any later one of the same listing or a repost
+        # of the same unit. Both checks look at every row, so the outcome is the same
+        # whether the history arrives in one batch or many
+        listings['Latest'] = ~(listings.duplicated(subset='Listing_URL', keep='last')
+                               | listings.duplicated(subset=cls.UNIT_COLUMNS, keep='last'))
+        # Hashes of the dedupe keys let later batches find the rows they supersede
+        listings['Url_Key'] = pd.util.hash_pandas_object(listings['Listing_URL'], index=False, categorize=False)
+        listings['Unit_Key'] = pd.util.hash_pandas_object(listings[cls.UNIT_COLUMNS], index=False, categorize=False)
+        listings['Day'] = (listings['Parsed_Date'] - pd.Timestamp(0)).dt.days.astype(float)
+        return listings
+
+    def update_from_csv(self, data_file_path):
+        """
+        Read only the rows appended to the CSV since the last update and merge them in.
+        Only meaningful for an instance that was started empty and fed from this CSV.
+
+        Args:
+        - data_file_path (str): Path to the CSV file containing rental data.
+
+        Returns:
+        - int: Number of new rows consumed.
+        """
+        with self._lock:
+            with file_lock(data_file_path):
+                new_rows, self._csv_offset = read_csv_tail(data_file_path, self._csv_offset)
+            return self.append(new_rows)
+
+    def append(self, new_rows):
+        """
+        Merge newly landed listing rows into the sorted feature matrix.
+
+        A row supersedes any indexed observation of the same listing or a repost of the
+        same unit, and rows without coordinates are left out since they can't be placed.
+        The cost is one linear merge over the index, with no re-parsing of the history.
+
+        Args:
+        - new_rows (pd.DataFrame): Listing rows newer than everything already indexed.
+
+        Returns:
+        - int: Number of new rows consumed.
+        """
+        if new_rows.empty:
+            return 0
+        new = self._prepare(new_rows)
+        placed = new[new['Latest']].dropna(subset=['Longitude', 'Latitude'])
+
+        with self._lock:
+            if self.reference_lat is None and len(placed):
+                # Project onto a local flat plane in km, which is accurate at metro scale
+                self.reference_lat = float(placed['Latitude'].median())
+                self.km_per_degree_lon = self.KM_PER_DEGREE_LON * np.cos(np.radians(self.reference_lat))
+            self.newest_day = np.nanmax([self.newest_day, new['Day'].max()])
+
+            keep = np.ones(len(self.x_km), dtype=bool)
+            if len(self.x_km):
+                keep &= ~(np.isin(self.url_key, new['Url_Key'].to_numpy())
+                          | np.isin(self.unit_key, new['Unit_Key'].to_numpy()))
+            x_km = placed['Longitude'].to_numpy() * (self.km_per_degree_lon or 0.0)
+            order = np.argsort(x_km, kind='stable')
+            row_id = self._row_count + np.arange(len(placed))
+            if len(placed):
+                self._batches.append(placed[self.OUTPUT_COLUMNS].reset_index(drop=True))
+                self._batch_starts.append(self._row_count)
+                self._row_count += len(placed)
+
+            # The kept rows are still sorted, so the new ones are slotted in at their
+            # sorted positions without re-sorting the index
+            all_kept = keep.all()
+
+            def merge(values, new_values):
+                return np.insert(values if all_kept else values[keep], at, new_values[order])
+
+            at = np.searchsorted(self.x_km if all_kept else self.x_km[keep], x_km[order], side='right')
+
+            self.row_id = merge(self.row_id, row_id)
+            self.x_km = merge(self.x_km, x_km)
+            self.y_km = merge(self.y_km, placed['Latitude'].to_numpy() * self.KM_PER_DEGREE_LAT)
+            self.sqft = merge(self.sqft, placed['Sqft'].to_numpy())
+            self.bedroom = merge(self.bedroom, placed['Bedroom'].to_numpy())
+            self.bathroom = merge(self.bathroom, placed['Bathroom'].to_numpy())
+            self.day = merge(self.day, placed['Day'].to_numpy())
+            self.url_key = merge(self.url_key, placed['Url_Key'].to_numpy())
+            self.unit_key = merge(self.unit_key, placed['Unit_Key'].to_numpy())
+            self.y_min = self.y_km.min() if len(self.y_km) else 0.0
+            self.y_max = self.y_km.max() if len(self.y_km) else 0.0
+
+            if len(self._batches) > self.MAX_BATCHES:
+                self._compact()
+        return len(new_rows)
+
+    def _compact(self):
+        """
+        Collapse the stored batches into one holding only the indexed rows, dropping
+        superseded observations. Callers must hold the index lock.
+        """
+        self._batches = [self._rows(self.row_id)]
+        self._batch_starts = [0]
+        self._row_count = len(self.row_id)
+        self.row_id = np.arange(self._row_count)
+
+    def _rows(self, row_ids):
+        """
+        Return the stored output rows with the given ids, in the order given.
+        """
+        batch = np.searchsorted(self._batch_starts, row_ids, side='right') - 1
+        parts, positions = [], []
+        for b in np.unique(batch):
+            in_batch = np.flatnonzero(batch == b)
+            parts.append(self._batches[b].iloc[row_ids[in_batch] - self._batch_starts[b]])
+            positions.append(in_batch)
+        if not parts:
+            return pd.DataFrame(columns=self.OUTPUT_COLUMNS)
+        rows = pd.concat(parts, ignore_index=True)
+        return rows.iloc[np.argsort(np.concatenate(positions))].reset_index(drop=True)
+
+    def _in_box(self, x, y, radius_km):
+        """
+        Return indices of listings inside the box of half-width radius_km around (x, y).
+        """
+        start, stop = np.searchsorted(self.x_km, [x - radius_km, x + radius_km])
+        idx = np.arange(start, stop)
+        return idx[np.abs(self.y_km[idx] - y) <= radius_km]
+
+    def _candidates(self, x, y, k, radius_km):
+        """
+        Return indices of listings inside a box around (x, y), doubling the box
+        until it holds at least k listings or covers the whole dataset, along with
+        the half-width of the final box.
+        """
+        while True:
+            idx = self._in_box(x, y, radius_km)
+            covers_all = (x - radius_km <= self.x_km[0] and x + radius_km >= self.x_km[-1] and
+                          y - radius_km <= self.y_min and y + radius_km >= self.y_max)
+            if len(idx) >= k or covers_all:
+                return idx, radius_km
+            radius_km *= 2
+
+    def _feature_distance(self, values, target, feature):
+        """
+        Weighted squared distance for one feature, charging a penalty where values are missing.
+        """
+        if target is None or self.weights[feature] == 0:
+            return 0.0
+        scaled = ((values - target) / self.SCALES[feature]) ** 2
+        scaled = np.where(np.isnan(scaled), self.MISSING_PENALTY, scaled)
+        return self.weights[feature] * scaled
+
+    def _score(self, idx, x, y, bedroom, bathroom, sqft):
+        """
+        Weighted squared distance from the target for the listings at idx, plus
+        their distance from it in km.
+        """
+        distance_km = np.hypot(self.x_km[idx] - x, self.y_km[idx] - y)
+        score = (self._feature_distance(distance_km, 0.0, 'Location')
+                 + self._feature_distance(self.sqft[idx], sqft, 'Sqft')
+                 + self._feature_distance(self.bedroom[idx], bedroom, 'Bedroom')
+                 + self._feature_distance(self.bathroom[idx], bathroom, 'Bathroom')
+                 + self._feature_distance(self.newest_day - self.day[idx], 0.0, 'Recency'))
+        return np.broadcast_to(score, idx.shape), distance_km
+
+    def get_comparables(self, longitude, latitude, bedroom=None, bathroom=None, sqft=None,
+                        k=20, radius_km=3.0):
+        """
+        Return the k listings closest to the target property.
+
+        Args:
+        - longitude, latitude (float): Location of the target property.
+        - bedroom (int, optional): Bedrooms of the target property.
+        - bathroom (float, optional): Bathrooms of the target property.
+        - sqft (float, optional): Square footage of the target property.
+        - k (int): Number of comparables to return.
+        - radius_km (float): Half-width of the initial search box.
+
+        Features left as None are ignored in the score.
+
+        Returns:
+        - pd.DataFrame: The comparables, best first, with 'Distance_Miles' and 'Score'
+          (lower is more comparable) columns.
+        """
+        with self._lock:
+            return self._get_comparables(longitude, latitude, bedroom, bathroom, sqft, k, radius_km)
+
+    def _get_comparables(self, longitude, latitude, bedroom, bathroom, sqft, k, radius_km):
+        """
+        Body of `get_comparables`; callers must hold the index lock.
+        """
+        if len(self.x_km) == 0:
+            return pd.DataFrame(columns=self.OUTPUT_COLUMNS + ['Distance_Miles', 'Score'])
+
+        x = longitude * self.km_per_degree_lon
+        y = latitude * self.KM_PER_DEGREE_LAT
+        idx, radius_km = self._candidates(x, y, k, radius_km)
+        score, distance_km = self._score(idx, x, y, bedroom, bathroom, sqft)
+
+        if len(idx) >= k:
+            # Every other term is non-negative, so a listing farther away than this
+            # has a location term alone above the current k-th best score
+            kth_score = np.partition(score, k - 1)[k - 1]
+            location_weight = self.weights['Location']
+            bound_km = (np.sqrt(kth_score / location_weight) * self.SCALES['Location']
+                        if location_weight > 0 else np.inf)
+            if bound_km > radius_km:
+                idx = self._in_box(x, y, bound_km)
+                score, distance_km = self._score(idx, x, y, bedroom, bathroom, sqft)
+
+        k = min(k, len(idx))
+        top = np.argpartition(score, k - 1)[:k] if k < len(idx) else np.arange(len(idx))
+        top = top[np.argsort(score[top], kind='stable')]
+
+        comparables = self._rows(self.row_id[idx[top]])
+        comparables['Distance_Miles'] = (distance_km[top] / self.KM_PER_MILE).round(2)
+        comparables['Score'] = np.sqrt(score[top]).round(3)
+        return comparables
@@ -1,3 +1,4 @@
+import os
 import requests
 from bs4 import BeautifulSoup
 import random
@@ -6,6 +7,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from src.ListingCleaner import ListingCleaner
+from src.RentalDataStore import file_lock
+
 class CraigslistRentalListingsScraper:
     def __init__(self, zipcode, miles, bedrooms, sample_size):
         self.zipcode = zipcode
@@ -56,20 +60,19 @@ class CraigslistRentalListingsScraper:
         """
         Extract the relevant info from the listing's BeautifulSoup object.
         """
-        price = self.extract_text(soup.find('span', class_='price'), '').replace('$','').replace(",",'')
+        price = self.extract_text(soup.find('span', class_='price'), '')
         address = self.extract_text(soup.find('h2', class_='street-address'), 'Unknown')
         latitude = self.extract_attribute(soup.find('div', class_='viewposting'), 'data-latitude', np.nan)
         longitude = self.extract_attribute(soup.find('div', class_='viewposting'), 'data-longitude', np.nan)
         
-        bedrooms, bathrooms, sqft = self.extract_housing_info(soup.find_all('span', class_='shared-line-bubble'))
+        housing = self.extract_housing_text(soup.find_all('span', class_='shared-line-bubble'))
         
+        # Price and housing are kept as raw text and parsed in bulk by ListingCleaner on save
         return {
             "Listing_URL": url,
             "Address": address,
             "Price": price,
-            "Bedroom": bedrooms,
-            "Bathroom": bathrooms,
-            "Sqft": sqft,
+            "Housing": housing,
             "Query_Zip_Code": str(self.zipcode),
             "Query_Miles": self.miles,
             "Longitude": longitude,
@@ -92,36 +95,32 @@ class CraigslistRentalListingsScraper:
         return element[attribute] if element else default
 
     @staticmethod
-    def extract_housing_info(elements):
+    def extract_housing_text(elements):
         """
-        Extract housing information (bedrooms, bathrooms, square footage) from listing.
+        Join the housing bubbles (bedrooms, bathrooms, square footage) into one raw string.
         """
-        bedrooms = bathrooms = sqft = np.nan
-
-        for element in elements:
-            text = element.text.split('/')
-            for item in text:
-                if 'BR' in item:
-                    bedrooms = item.split('BR')[0].strip()
-                elif 'Ba' in item:
-                    bathrooms = item.split('Ba')[0].strip()
-                elif 'ft2' in item:
-                    sqft = item.split('ft2')[0].strip()
-
-        return bedrooms, bathrooms, sqft
+        return ' / '.join(element.text.strip() for element in elements)
 
-    def save_to_csv(self, filename):
+    def save_to_csv(self, filename, quarantine_filename=None):
         """
-        Save the scraped data to a CSV file.
+        Clean the scraped batch and append it to a CSV file. Rows that fail parsing
+        or range validation are appended to a quarantine CSV instead.
         """
-        df = pd.DataFrame(self.listings_data)
-
-        # Cleaning and formatting the DataFrame
-        numeric_cols = ['Price', 'Bedroom', 'Bathroom']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        df['Query_Zip_Code'] = df['Query_Zip_Code'].astype(str)
-        df['Query_Miles'] = df['Query_Miles'].astype(float)
-        df.to_csv(filename, index=False, mode='a', header=False)  # Appending to an existing CSV
+        if not self.listings_data:
+            print("No listings to save.")
+            return
+
+        df, quarantined = ListingCleaner.clean(pd.DataFrame(self.listings_data))
+        # Concurrent sessions append to the same file, so writes go through one at a time
+        with file_lock(filename):
+            df.to_csv(filename, index=False, mode='a', header=False)  # Appending to an existing CSV
         print(f"Cleaned dataset saved to {filename}: {df.shape}")
+
+        if not quarantined.empty:
+            if quarantine_filename is None:
+                root, ext = os.path.splitext(filename)
+                quarantine_filename = f'{root}_Quarantine{ext}'
+            with file_lock(quarantine_filename):
+                write_header = not os.path.exists(quarantine_filename)
+                quarantined.to_csv(quarantine_filename, index=False, mode='a', header=write_header)
+            print(f"Quarantined rows saved to {quarantine_filename}: {quarantined.shape}")
@@ -0,0 +1,249 @@
+import glob
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.ListingCleaner import ListingCleaner
+
+class FairRentModel:
+    """
+    A hierarchical shrinkage model of log rent.
+
+    Rent is modelled as a global level plus bedroom, ZIP code and ZIP x bedroom
+    effects, each shrunk toward its parent in proportion to how few listings back
+    it, plus linear adjustments for square footage and bathrooms. Sparse ZIP codes
+    therefore fall back smoothly to the bedroom-wide estimate, with wider intervals.
+
+    The model is trained offline (see train_fair_rent_model.py), saved as a
+    versioned JSON artifact, and loaded once for fast vectorized prediction.
+    """
+
+    # Pseudo-listings pulling each group effect toward its parent estimate
+    PRIOR_STRENGTH = 5.0
+    # Residual quantiles giving an 80% prediction interval
+    INTERVAL_QUANTILES = (0.10, 0.90)
+    ARTIFACT_PREFIX = 'fair_rent_'
+
+    def __init__(self, params):
+        """
+        Initialize the model from trained parameters (as produced by `fit` or `load`).
+
+        Args:
+        - params (dict): Trained model parameters.
+        """
+        self.params = params
+        self.version = params['version']
+        # Plain dict lookup tables keep single-property predictions well under a millisecond
+        self.bedroom_effect = params['bedroom_effect']
+        self.bedroom_log_sqft = params['bedroom_log_sqft']
+        self.bedroom_bathroom = params['bedroom_bathroom']
+        self.zip_effect = params['zip_effect']
+        self.zip_bedroom_effect = params['zip_bedroom_effect']
+        self.zip_bedroom_count = params['zip_bedroom_count']
+
+    @staticmethod
+    def prepare_training_data(df):
+        """
+        Select one valid observation per listing for training.
+
+        Args:
+        - df (pd.DataFrame): Listings history.
+
+        Returns:
+        - pd.DataFrame: Listings with numeric Price, Bedroom, Bathroom and Sqft.
+        """
+        df = df.drop_duplicates(subset='Listing_URL', keep='last').copy()
+        for col in ['Price', 'Bedroom', 'Bathroom', 'Sqft']:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        df['Query_Zip_Code'] = df['Query_Zip_Code'].astype(str)
+
+        low, high = ListingCleaner.VALID_RANGES['Price']
+        df = df[df['Price'].between(low, high) & df['Bedroom'].notna()].copy()
+        for col in ['Bathroom', 'Sqft']:
+            low, high = ListingCleaner.VALID_RANGES[col]
+            df.loc[~df[col].between(low, high), col] = np.nan
+        df['Bedroom'] = df['Bedroom'].astype(int)
+        return df
+
+    @classmethod
+    def _shrunk_effect(cls, residual, keys):
+        """
+        Mean residual per group, shrunk toward zero by PRIOR_STRENGTH pseudo-listings.
+        """
+        grouped = residual.groupby(keys)
+        return grouped.sum() / (grouped.count() + cls.PRIOR_STRENGTH)
+
+    @staticmethod
+    def _zip_bedroom_key(zipcodes, bedrooms):
+        return zipcodes.astype(str).str.cat(bedrooms.astype(str), sep='|')
+
+    @classmethod
+    def fit(cls, df):
+        """
+        Train the model on a listings history.
+
+        Args:
+        - df (pd.DataFrame): Listings history as stored in the listings CSV.
+
+        Returns:
+        - FairRentModel: The trained model.
+        """
+        df = cls.prepare_training_data(df).reset_index(drop=True)
+        if df.empty:
+            raise ValueError("No valid listings to train the fair rent model on.")
+
+        y = np.log(df['Price'])
+        bedroom = df['Bedroom'].astype(str)
+        zipcode = df['Query_Zip_Code']
+        zip_bedroom = cls._zip_bedroom_key(zipcode, df['Bedroom'])
+
+        # Group effects, each fitted on what its parents leave unexplained
+        level = y.mean()
+        residual = y - level
+        bedroom_effect = cls._shrunk_effect(residual, bedroom)
+        residual = residual - bedroom.map(bedroom_effect)
+        zip_effect = cls._shrunk_effect(residual, zipcode)
+        residual = residual - zipcode.map(zip_effect)
+        zip_bedroom_effect = cls._shrunk_effect(residual, zip_bedroom)
+        residual = residual - zip_bedroom.map(zip_bedroom_effect)
+
+        # Size adjustments relative to the typical unit with the same bedroom count,
+        # so a missing value contributes nothing
+        log_sqft = np.log(df['Sqft'])
+        bedroom_log_sqft = log_sqft.groupby(bedroom).mean()
+        bedroom_bathroom = df['Bathroom'].groupby(bedroom).mean()
+        features = np.column_stack([
+            (log_sqft - bedroom.map(bedroom_log_sqft)).fillna(0.0),
+            (df['Bathroom'] - bedroom.map(bedroom_bathroom)).fillna(0.0),
+        ])
+        slopes = np.linalg.lstsq(features, residual.to_numpy(), rcond=None)[0]
+        residual = residual - features @ slopes
+
+        interval = np.quantile(residual, cls.INTERVAL_QUANTILES)
+
+        params = {
+            'version': datetime.now().strftime('%Y%m%d%H%M%S%f'),
+            'trained_on_rows': int(len(df)),
+            'level': float(level),
+            'sqft_slope': float(slopes[0]),
+            'bathroom_slope': float(slopes[1]),
+            'interval_log_offsets': [float(q) for q in interval],
+            'bedroom_effect': bedroom_effect.to_dict(),
+            'bedroom_log_sqft': bedroom_log_sqft.dropna().to_dict(),
+            'bedroom_bathroom': bedroom_bathroom.dropna().to_dict(),
+            'zip_effect': zip_effect.to_dict(),
+            'zip_bedroom_effect': zip_bedroom_effect.to_dict(),
+            'zip_bedroom_count': zip_bedroom.value_counts().to_dict(),
+        }
+        return cls(params)
+
+    def save(self, model_dir):
+        """
+        Write the model to '<model_dir>/fair_rent_<version>.json'.
+
+        Args:
+        - model_dir (str): Directory holding the versioned model artifacts.
+
+        Returns:
+        - str: Path to the written artifact.
+
+        Raises:
+        - FileExistsError: If an artifact with this version already exists.
+        """
+        os.makedirs(model_dir, exist_ok=True)
+        path = os.path.join(model_dir, f'{self.ARTIFACT_PREFIX}{self.version}.json')
+        # Never overwrite an existing version
+        with open(path, 'x') as f:
+            json.dump(self.params, f)
+        return path
+
+    @classmethod
+    def latest_version(cls, model_dir):
+        """
+        Return the version of the newest saved model.
+
+        Args:
+        - model_dir (str): Directory holding the versioned model artifacts.
+
+        Returns:
+        - str: The newest version.
+
+        Raises:
+        - FileNotFoundError: If no model has been saved yet.
+        """
+        # Versions are fixed-width timestamps, so the newest artifact sorts last
+        artifacts = sorted(glob.glob(os.path.join(model_dir, f'{cls.ARTIFACT_PREFIX}*.json')))
+        if not artifacts:
+            raise FileNotFoundError(f"No fair rent model found in {model_dir}")
+        return os.path.basename(artifacts[-1])[len(cls.ARTIFACT_PREFIX):-len('.json')]
+
+    @classmethod
+    def load(cls, model_dir, version=None):
+        """
+        Load a saved model, the newest one unless a version is given.
+
+        Args:
+        - model_dir (str): Directory holding the versioned model artifacts.
+        - version (str, optional): The version to load.
+
+        Returns:
+        - FairRentModel: The loaded model.
+        """
+        if version is None:
+            version = cls.latest_version(model_dir)
+        path = os.path.join(model_dir, f'{cls.ARTIFACT_PREFIX}{version}.json')
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def predict(self, zipcodes, bedrooms, bathrooms=None, sqft=None):
+        """
+        Predict the fair rent and an 80% interval for a batch of properties.
+
+        Args:
+        - zipcodes (array-like of str): ZIP codes of the properties.
+        - bedrooms (array-like of int): Bedroom counts.
+        - bathrooms (array-like of float, optional): Bathroom counts; NaN if unknown.
+        - sqft (array-like of float, optional): Square footage; NaN if unknown.
+
+        Returns:
+        - pd.DataFrame: 'Fair_Rent', 'Lower', 'Upper' and 'Supporting_Listings' (the
+          number of training listings with the same ZIP code and bedroom count).
+        """
+        zipcodes = [str(zipcode) for zipcode in np.atleast_1d(zipcodes)]
+        bedroom_keys = [str(int(bedroom)) for bedroom in np.atleast_1d(bedrooms)]
+        zip_bedroom_keys = [f'{zipcode}|{bedroom}' for zipcode, bedroom in zip(zipcodes, bedroom_keys)]
+        n = len(zipcodes)
+
+        def lookup(table, keys, default=np.nan):
+            # Unseen keys fall back to the parent estimate, i.e. an effect of zero
+            return np.fromiter((table.get(key, default) for key in keys), dtype=float, count=n)
+
+        log_rent = (self.params['level']
+                    + lookup(self.bedroom_effect, bedroom_keys, 0.0)
+                    + lookup(self.zip_effect, zipcodes, 0.0)
+                    + lookup(self.zip_bedroom_effect, zip_bedroom_keys, 0.0))
+
+        if sqft is not None:
+            sqft = np.broadcast_to(np.asarray(sqft, dtype=float), n)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                deviation = np.log(sqft) - lookup(self.bedroom_log_sqft, bedroom_keys)
+            log_rent += self.params['sqft_slope'] * np.where(np.isfinite(deviation), deviation, 0.0)
+        if bathrooms is not None:
+            bathrooms = np.broadcast_to(np.asarray(bathrooms, dtype=float), n)
+            deviation = bathrooms - lookup(self.bedroom_bathroom, bedroom_keys)
+            log_rent += self.params['bathroom_slope'] * np.nan_to_num(deviation)
+
+        # Widen the interval where few listings back the ZIP x bedroom estimate
+        count = lookup(self.zip_bedroom_count, zip_bedroom_keys, 0.0)
+        widen = np.sqrt(1.0 + self.PRIOR_STRENGTH / (count + self.PRIOR_STRENGTH))
+        low_offset, high_offset = self.params['interval_log_offsets']
+
+        return pd.DataFrame({
+            'Fair_Rent': np.exp(log_rent),
+            'Lower': np.exp(log_rent + low_offset * widen),
+            'Upper': np.exp(log_rent + high_offset * widen),
+            'Supporting_Listings': count.astype(int),
+        })
@@ -3,9 +3,10 @@ import pandas as pd
 from streamlit_echarts import st_echarts
 
 class GaugeChart:
-    def __init__(self, data_file_path):
+    def __init__(self, data_file_path, df=None):
         self.data_file_path = data_file_path
-        self.df = pd.read_csv(data_file_path)
+        # Reuse an already loaded (shared) DataFrame when one is given
+        self.df = df if df is not None else pd.read_csv(data_file_path)
 
     def get_chart(self, zipcode, bedroom, estimatedRent, queryDatePrior, queryDate):
         # focus on query zip code
@@ -0,0 +1,122 @@
+import pandas as pd
+
+class ListingCleaner:
+    """
+    Batched post-processing for scraped listings. Parses the raw price and housing
+    text of a whole batch with vectorized regexes, validates value ranges and
+    splits out rows that fail validation so only typed, sane rows reach the store.
+    """
+
+    # Column order of the listings CSV, which is appended to without a header
+    OUTPUT_COLUMNS = ['Listing_URL', 'Address', 'Price', 'Bedroom', 'Bathroom', 'Sqft',
+                      'Query_Zip_Code', 'Query_Miles', 'Longitude', 'Latitude', 'Query_Date']
+
+    # Patterns over the housing bubble text, e.g. "2BR / 1.5Ba 850ft2"
+    BEDROOM_PATTERN = r'(?<![\w.])(\d+)\s*BR\b'
+    BATHROOM_PATTERN = r'(?<![\w.])(\d+(?:\.\d+)?)\s*Ba\b'
+    SQFT_PATTERN = r'(?<![\w.])(\d[\d,]*)\s*ft2\b'
+    PRICE_PATTERN = r'^\s*\$?\s*(\d[\d,]*(?:\.\d+)?)\s*$'
+    # Unit tokens showing the housing text carries a value, even when its number doesn't parse
+    HOUSING_TOKENS = {
+        'Bedroom': r'BR\b',
+        'Bathroom': r'Ba\b',
+        'Sqft': r'ft2\b',
+    }
+
+    # Inclusive (min, max) bounds; missing values are allowed except for Price
+    VALID_RANGES = {
+        'Price': (100, 50000),
+        'Bedroom': (0, 10),
+        'Bathroom': (0, 10),
+        'Sqft': (50, 20000),
+    }
+
+    @classmethod
+    def parse(cls, df):
+        """
+        Parse raw 'Price' and 'Housing' text columns into typed numeric columns.
+
+        Args:
+        - df (pd.DataFrame): Raw listings with 'Price' and 'Housing' text columns.
+
+        Returns:
+        - pd.DataFrame: Listings with numeric 'Price', 'Bedroom', 'Bathroom' and 'Sqft'.
+        """
+        df = df.copy()
+        housing = df['Housing'].fillna('').astype(str)
+        price = df['Price'].fillna('').astype(str)
+
+        df['Price'] = pd.to_numeric(
+            price.str.extract(cls.PRICE_PATTERN, expand=False).str.replace(',', '', regex=False),
+            errors='coerce'
+        )
+        df['Bedroom'] = pd.to_numeric(housing.str.extract(cls.BEDROOM_PATTERN, expand=False), errors='coerce')
+        df['Bathroom'] = pd.to_numeric(housing.str.extract(cls.BATHROOM_PATTERN, expand=False), errors='coerce')
+        df['Sqft'] = pd.to_numeric(
+            housing.str.extract(cls.SQFT_PATTERN, expand=False).str.replace(',', '', regex=False),
+            errors='coerce'
+        )
+        df['Longitude'] = pd.to_numeric(df['Longitude'], errors='coerce')
+        df['Latitude'] = pd.to_numeric(df['Latitude'], errors='coerce')
+        return df
+
+    @classmethod
+    def validate(cls, df, raw=None):
+        """
+        Flag parsed rows that are missing a price, hold out-of-range values, or whose
+        raw text has a value the patterns failed to parse.
+
+        Args:
+        - df (pd.DataFrame): Parsed listings.
+        - raw (pd.DataFrame, optional): The same listings before parsing, with 'Price' and
+          'Housing' text columns. Without it, unparsed values can't be told from missing ones.
+
+        Returns:
+        - pd.Series: The reason each row is rejected, or an empty string for valid rows.
+        """
+        reasons = pd.Series('', index=df.index)
+        if raw is None:
+            reasons[df['Price'].isna()] = 'Price:missing;'
+        else:
+            has_price = raw['Price'].fillna('').astype(str).str.strip() != ''
+            reasons[df['Price'].isna() & ~has_price] = 'Price:missing;'
+            reasons[df['Price'].isna() & has_price] = 'Price:unparsed;'
+            housing = raw['Housing'].fillna('').astype(str)
+            for col, token in cls.HOUSING_TOKENS.items():
+                unparsed = df[col].isna() & housing.str.contains(token, regex=True)
+                reasons[unparsed] += f'{col}:unparsed;'
+        for col, (low, high) in cls.VALID_RANGES.items():
+            out_of_range = df[col].notna() & ~df[col].between(low, high)
+            reasons[out_of_range] += f'{col}:out_of_range;'
+        return reasons
+
+    @classmethod
+    def clean(cls, df):
+        """
+        Parse, validate and type a batch of raw listings.
+
+        Args:
+        - df (pd.DataFrame): Raw listings as produced by the scraper.
+
+        Returns:
+        - (pd.DataFrame, pd.DataFrame): The clean rows in store column order, and the
+          quarantined rows with their raw text and a 'Reason' column.
+        """
+        parsed = cls.parse(df)
+        reasons = cls.validate(parsed, raw=df)
+        bad = reasons != ''
+
+        quarantined = df[bad].copy()
+        quarantined['Reason'] = reasons[bad]
+
+        clean = parsed[~bad][cls.OUTPUT_COLUMNS].copy()
+        clean[['Price', 'Sqft']] = clean[['Price', 'Sqft']].round()
+        clean = clean.astype({
+            'Price': 'Int64',
+            'Bedroom': 'Int64',
+            'Bathroom': float,
+            'Sqft': 'Int64',
+            'Query_Zip_Code': str,
+            'Query_Miles': float,
+        })
+        return clean, quarantined
@@ -1,7 +1,7 @@
 import pandas as pd
 
 class NearbyRentalListings:
-    def __init__(self, data_file_path, current_rent):
+    def __init__(self, data_file_path, current_rent, df=None):
         """
         Initialize the NearbyRentalListings object with the path to the data file
         and the user's current rent.
@@ -9,10 +9,12 @@ class NearbyRentalListings:
         Args:
         - data_file_path (str): Path to the CSV file containing rental data.
         - current_rent (float): The user's current rent.
+        - df (pd.DataFrame, optional): An already loaded listings DataFrame to use
+          instead of reading the data file.
         """
         self.data_file_path = data_file_path
         self.current_rent = current_rent
-        self.df = pd.read_csv(data_file_path)
+        self.df = df if df is not None else pd.read_csv(data_file_path)
 
     def get_nearby_properties(self, zipcode, bedroom, query_date_prior, query_date):
         """
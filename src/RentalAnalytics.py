@@ -4,18 +4,24 @@ import seaborn as sns
 import datetime as dt
 import streamlit as st
 
+from src.RentalTrends import RentalTrends
+
 class RentalAnalytics:
-    def __init__(self, data_file_path):
+    def __init__(self, data_file_path, trends=None, df=None):
         """
         Initialize the RentalAnalytics object with the path to the data file
         and the user's current rent.
         
         Args:
         - data_file_path (str): Path to the CSV file containing rental data.
-        - current_rent (float): The user's current rent.
+        - trends (RentalTrends, optional): A long-lived trend engine to update
+          incrementally; a fresh one is built from the full history if omitted.
+        - df (pd.DataFrame, optional): An already loaded listings DataFrame to use
+          instead of reading the data file.
         """
         self.data_file_path = data_file_path
-        self.df = pd.read_csv(data_file_path)
+        self.df = df if df is not None else pd.read_csv(data_file_path)
+        self.trends = trends if trends is not None else RentalTrends()
 
     def clean_data(self, df):
         """
@@ -79,4 +85,48 @@ class RentalAnalytics:
         plt.xlabel('Number of Bedrooms')
         plt.ylabel('Price')
         plt.grid(True)
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+    def get_market_trends(self, zipcode, bedroom, window=4):
+        """
+        Bring the trend engine up to date with any newly appended listings and
+        return the weekly trend lines for the given ZIP code and bedroom count.
+
+        Args:
+        - zipcode (str): The ZIP code to filter the rental data.
+        - bedroom (int): The number of bedrooms to filter the rental data.
+        - window (int): Number of weeks in the rolling median window.
+
+        Returns:
+        - pd.DataFrame: Weekly listing volume, median price, rolling median price
+          and median days on market.
+        """
+        self.trends.update_from_csv(self.data_file_path)
+        return self.trends.get_trends(zipcode, bedroom, window=window)
+
+    def plot_market_trends(self, zipcode, bedroom, window=4):
+        """
+        Create line charts of weekly median rent (with its rolling median),
+        listing volume and days on market.
+
+        Args:
+        - zipcode (str): The ZIP code to filter the rental data.
+        - bedroom (int): The number of bedrooms to filter the rental data.
+        - window (int): Number of weeks in the rolling median window.
+        """
+        trends = self.get_market_trends(zipcode, bedroom, window=window)
+
+        fig, axes = plt.subplots(3, 1, figsize=(10, 9), sharex=True)
+        axes[0].plot(trends.index, trends['Median_Price'], marker='o', label='Weekly Median')
+        axes[0].plot(trends.index, trends['Rolling_Median_Price'], linestyle='--', label=f'{window}-Week Rolling Median')
+        axes[0].set_ylabel('Price')
+        axes[0].legend()
+        axes[1].bar(trends.index, trends['Listings'], width=5)
+        axes[1].set_ylabel('Listings')
+        axes[2].plot(trends.index, trends['Median_Days_On_Market'], marker='o')
+        axes[2].set_ylabel('Days on Market')
+        axes[2].set_xlabel('Week')
+        for ax in axes:
+            ax.grid(True)
+        fig.suptitle('Weekly Market Trends')
+        return fig
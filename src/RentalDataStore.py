@@ -0,0 +1,127 @@
+import io
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; fall back to in-process locking only
+    fcntl = None
+
+# Sessions share the listings frame through shallow copies, which is only safe when
+# copy-on-write keeps their changes private; pandas 3 always has it on
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on a data file while appending to or reading it.
+
+    Threads in this process serialize on a per-path lock, and other processes are
+    kept out with an advisory flock on a sidecar '<path>.lock' file where supported.
+
+    Args:
+    - path (str): Path to the data file being guarded.
+    """
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        lock = _path_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(key + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def read_csv_tail(path, offset=0):
+    """
+    Read only the rows appended to a CSV after a byte offset.
+
+    The header is re-read for the column names, then the file is read from `offset`
+    up to its last complete line, so a row still being written is left for next time.
+
+    Args:
+    - path (str): Path to the CSV file.
+    - offset (int): Byte offset returned by the previous call, or 0 to read every row.
+
+    Returns:
+    - (pd.DataFrame, int): The new rows, and the offset to pass on the next call.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(max(offset, len(header)))
+        data = f.read()
+
+    complete = data.rfind(b'\n') + 1
+    new_offset = max(offset, len(header)) + complete
+    new_rows = pd.read_csv(io.BytesIO(header + data[:complete]))
+    return new_rows, new_offset
+
+class RentalDataStore:
+    """
+    A process-wide, thread-safe holder of the listings DataFrame.
+
+    The CSV is read once; after that only the rows appended since the last read are
+    parsed and added to the shared frame, so one session's ingest doesn't make every
+    other session wait on a full reload. Sessions get cheap shallow copies; importing
+    this module enables pandas copy-on-write, so any change a session makes to its
+    copy never reaches the shared frame.
+    """
+
+    def __init__(self, data_file_path):
+        """
+        Initialize the store with the path to the data file.
+
+        Args:
+        - data_file_path (str): Path to the CSV file containing rental data.
+        """
+        self.data_file_path = data_file_path
+        self._lock = threading.Lock()
+        self._df = None
+        self._version = None
+        self._offset = 0
+
+    def version(self):
+        """
+        Return a token identifying the current contents of the append-only CSV.
+
+        Returns:
+        - tuple: The file's modification time in nanoseconds and its size in bytes.
+        """
+        stat = os.stat(self.data_file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_df(self):
+        """
+        Return a copy-on-read view of the listings, first adding any rows appended
+        to the CSV since the last call.
+
+        Returns:
+        - pd.DataFrame: A shallow copy of the shared listings DataFrame.
+        """
+        with self._lock:
+            version = self.version()
+            if version != self._version:
+                if version[1] < self._offset:
+                    # The file was replaced rather than appended to; start over
+                    self._df, self._offset = None, 0
+                # Read under the file lock so a concurrent append is never half-read
+                with file_lock(self.data_file_path):
+                    new_rows, self._offset = read_csv_tail(self.data_file_path, self._offset)
+                    self._version = self.version()
+                if self._df is None:
+                    self._df = new_rows
+                elif not new_rows.empty:
+                    self._df = pd.concat([self._df, new_rows], ignore_index=True)
+            return self._df.copy(deep=False)
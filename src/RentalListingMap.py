@@ -1,15 +1,85 @@
+import numpy as np
 import pandas as pd
 import pydeck as pdk
 import streamlit as st
 
 class RentalListingMap:
+    # Approximate size of the map viewport and of one cluster cell, in screen pixels
+    VIEWPORT_PIXELS = (1000, 600)
+    CLUSTER_CELL_PIXELS = 60
+
     def __init__(self, mapbox_token):
         # Store the Mapbox access token upon class instantiation
         self.mapbox_token = mapbox_token
         #pdk.set_mapbox_access_token(self.mapbox_token)  # You can uncomment this if you prefer setting it here.
 
-    def render_map(self, df, target_lon, target_lat):
-        # Assuming `df` DataFrame contains columns 'Latitude', 'Longitude', and 'Description'
+    @staticmethod
+    def degrees_per_pixel(zoom):
+        """
+        Degrees of longitude covered by one screen pixel at a web-mercator zoom level.
+        """
+        return 360.0 / (256 * 2 ** zoom)
+
+    @classmethod
+    def viewport_bounds(cls, target_lon, target_lat, zoom):
+        """
+        Approximate the (min_lon, min_lat, max_lon, max_lat) box visible around the target.
+        """
+        lon_per_px = cls.degrees_per_pixel(zoom)
+        lat_per_px = lon_per_px * np.cos(np.radians(target_lat))
+        half_width = cls.VIEWPORT_PIXELS[0] / 2 * lon_per_px
+        half_height = cls.VIEWPORT_PIXELS[1] / 2 * lat_per_px
+        return (target_lon - half_width, target_lat - half_height,
+                target_lon + half_width, target_lat + half_height)
+
+    @classmethod
+    def cluster_listings(cls, df, target_lon, target_lat, zoom=12):
+        """
+        Aggregate listings inside the viewport into screen-space grid clusters.
+
+        Args:
+        - df (pd.DataFrame): Listings with 'Listing_URL', 'Longitude', 'Latitude' and 'Price' columns.
+        - target_lon, target_lat (float): Center of the map.
+        - zoom (int): Map zoom level; clusters shrink to single listings as it grows.
+
+        Returns:
+        - pd.DataFrame: One compact row per cluster with 'lon', 'lat', listing count 'n',
+          numeric median 'price' (NaN when no listing in it has a price) and its
+          formatted 'price_label' for the tooltip.
+        """
+        # A listing scraped on several days only needs to be drawn once
+        listings = df.drop_duplicates(subset='Listing_URL', keep='last')
+        lon = pd.to_numeric(listings['Longitude'], errors='coerce').to_numpy()
+        lat = pd.to_numeric(listings['Latitude'], errors='coerce').to_numpy()
+        price = pd.to_numeric(listings['Price'], errors='coerce').to_numpy()
+
+        min_lon, min_lat, max_lon, max_lat = cls.viewport_bounds(target_lon, target_lat, zoom)
+        in_view = (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+        lon, lat, price = lon[in_view], lat[in_view], price[in_view]
+
+        cell_lon = cls.CLUSTER_CELL_PIXELS * cls.degrees_per_pixel(zoom)
+        cell_lat = cell_lon * np.cos(np.radians(target_lat))
+        points = pd.DataFrame({
+            'cell_x': np.floor(lon / cell_lon).astype(np.int64),
+            'cell_y': np.floor(lat / cell_lat).astype(np.int64),
+            'lon': lon,
+            'lat': lat,
+            'price': price,
+        })
+        clusters = points.groupby(['cell_x', 'cell_y']).agg(
+            lon=('lon', 'mean'),
+            lat=('lat', 'mean'),
+            n=('lon', 'size'),
+            price=('price', 'median'),
+        ).reset_index(drop=True)
+
+        clusters[['lon', 'lat']] = clusters[['lon', 'lat']].round(5)
+        clusters['n'] = clusters['n'].astype(np.int32)
+        clusters['price_label'] = [f'${price:,.0f}' if pd.notna(price) else 'unknown' for price in clusters['price']]
+        return clusters
+
+    def render_map(self, clusters, target_lon, target_lat, zoom=12):
+        # Assuming `clusters` comes from `cluster_listings` with columns 'lon', 'lat', 'n' and 'price_label'
         target_data = {
             'Description': ['Target Location'],
             'Latitude': [target_lat],
@@ -20,10 +90,15 @@ class RentalListingMap:
 
         rental_layer = pdk.Layer(
             'ScatterplotLayer',
-            data=df.drop_duplicates().head(20),
-            get_position='[Longitude, Latitude]',
+            # Only what the layer draws is sent to the browser; NaN prices aren't valid JSON
+            data=clusters[['lon', 'lat', 'n', 'price_label']],
+            get_position='[lon, lat]',
             get_color='[200, 30, 0, 160]',
-            get_radius=100,
+            get_radius='n',
+            radius_scale=40,
+            radius_min_pixels=4,
+            radius_max_pixels=40,
+            pickable=True,
         )
 
         target_layer = pdk.Layer(
@@ -40,11 +115,12 @@ class RentalListingMap:
             initial_view_state=pdk.ViewState(
                 latitude=target_lat,
                 longitude=target_lon,
-                zoom=12,
+                zoom=zoom,
                 pitch=10,
             ),
             layers=[
                 rental_layer,
                 target_layer,
             ],
+            tooltip={'text': '{n} listings\nMedian price: {price_label}'},
         ))
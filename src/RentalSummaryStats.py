@@ -2,7 +2,7 @@ import pandas as pd
 import streamlit as st
 
 class RentalSummaryStats:
-    def __init__(self, data_file_path, current_rent):
+    def __init__(self, data_file_path, current_rent, df=None):
         """
         Initialize the RentalSummaryStats object with the path to the data file
         and the user's current rent.
@@ -10,10 +10,12 @@ class RentalSummaryStats:
         Args:
         - data_file_path (str): Path to the CSV file containing rental data.
         - current_rent (float): The user's current rent.
+        - df (pd.DataFrame, optional): An already loaded listings DataFrame to use
+          instead of reading the data file.
         """
         self.data_file_path = data_file_path
         self.current_rent = current_rent
-        self.df = pd.read_csv(data_file_path)
+        self.df = df if df is not None else pd.read_csv(data_file_path)
 
     def get_summary_stats(self, zipcode, bedroom, query_date_prior, query_date):
         """
@@ -0,0 +1,191 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.RentalDataStore import file_lock, read_csv_tail
+
+class RentalTrends:
+    """
+    Incrementally maintained weekly market trends per ZIP code and bedroom count.
+
+    The listings CSV is append-only, so the engine remembers the byte offset it has
+    read up to and only folds newly landed Query_Date partitions into its per-week
+    aggregates. Every update costs time proportional to the new batch, not the history.
+    """
+
+    GROUP_KEYS = ['Query_Zip_Code', 'Bedroom', 'Week']
+
+    def __init__(self):
+        # Guards the aggregates when one engine is shared by concurrent sessions
+        self._lock = threading.RLock()
+        self.rows_seen = 0
+        self._csv_offset = 0
+        # Sorted price arrays per (zip, bedroom, week) bucket, kept so medians stay exact
+        self._prices = {}
+        # (Listing_URL, zip, bedroom, week) keys already counted, so re-scrapes don't
+        # inflate volume; a listing found by searches for several zips counts under each
+        self._seen_listing_weeks = set()
+        # Weekly stats per (zip, bedroom): {week: {'Listings', 'Median_Price', 'Mean_Price'}}
+        self._weekly = {}
+        # Per (zip, bedroom), the first and last Query_Date each of its listings was observed on
+        self._listing_dates = {}
+
+    @property
+    def weekly(self):
+        """
+        All weekly aggregates as one DataFrame indexed by (zip, bedroom, week).
+        """
+        with self._lock:
+            rows = {
+                (zipcode, bedroom, week): stats
+                for (zipcode, bedroom), weeks in self._weekly.items()
+                for week, stats in weeks.items()
+            }
+        weekly = pd.DataFrame.from_dict(rows, orient='index',
+                                        columns=['Listings', 'Median_Price', 'Mean_Price'])
+        weekly.index = pd.MultiIndex.from_tuples(weekly.index, names=self.GROUP_KEYS)
+        return weekly.sort_index()
+
+    @staticmethod
+    def parse_query_dates(dates):
+        """
+        Parse Query_Date values, which the history stores as either 'YYYY-MM-DD'
+        or the older 'YYYY-DD-MM' layout.
+
+        Args:
+        - dates (pd.Series): Raw Query_Date values.
+
+        Returns:
+        - pd.Series: Parsed datetimes (NaT where neither layout matches).
+        """
+        dates = dates.astype(str)
+        parsed = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce')
+        fallback = pd.to_datetime(dates, format='%Y-%d-%m', errors='coerce')
+        return parsed.fillna(fallback)
+
+    def update_from_csv(self, data_file_path):
+        """
+        Read only the rows appended to the CSV since the last update and fold them in.
+
+        Args:
+        - data_file_path (str): Path to the CSV file containing rental data.
+
+        Returns:
+        - int: Number of new rows consumed.
+        """
+        with self._lock:
+            with file_lock(data_file_path):
+                new_rows, self._csv_offset = read_csv_tail(data_file_path, self._csv_offset)
+            return self.update(new_rows)
+
+    def update(self, new_rows):
+        """
+        Fold a batch of newly landed listing rows into the weekly aggregates.
+        Only the (zip, bedroom, week) buckets and listings touched by the batch are updated.
+
+        Args:
+        - new_rows (pd.DataFrame): Listing rows not previously passed to the engine.
+
+        Returns:
+        - int: Number of new rows consumed.
+        """
+        with self._lock:
+            return self._update(new_rows)
+
+    def _update(self, new_rows):
+        """
+        Body of `update`; callers must hold the engine lock.
+        """
+        self.rows_seen += len(new_rows)
+        if new_rows.empty:
+            return 0
+
+        df = new_rows[['Listing_URL', 'Query_Zip_Code', 'Bedroom', 'Price', 'Query_Date']].copy()
+        df['Query_Zip_Code'] = df['Query_Zip_Code'].astype(str)
+        df['Price'] = pd.to_numeric(df['Price'], errors='coerce')
+        df['Bedroom'] = pd.to_numeric(df['Bedroom'], errors='coerce')
+        df['Query_Date'] = self.parse_query_dates(df['Query_Date'])
+        df = df.dropna(subset=['Bedroom', 'Query_Date'])
+        df['Bedroom'] = df['Bedroom'].astype(int)
+        df['Week'] = df['Query_Date'].dt.to_period('W').dt.start_time
+
+        self._update_listing_dates(df)
+
+        # Count each listing once per zip, bedroom and week, however many times it was scraped
+        df = df.drop_duplicates(subset=['Listing_URL', 'Query_Zip_Code', 'Bedroom', 'Week'])
+        listing_weeks = list(zip(df['Listing_URL'], df['Query_Zip_Code'], df['Bedroom'], df['Week']))
+        is_new = np.array([lw not in self._seen_listing_weeks for lw in listing_weeks], dtype=bool)
+        df = df[is_new]
+        self._seen_listing_weeks.update(lw for lw, new in zip(listing_weeks, is_new) if new)
+
+        for (zipcode, bedroom, week), group in df.groupby(self.GROUP_KEYS):
+            key = (zipcode, bedroom, week)
+            prices = group['Price'].dropna().to_numpy(dtype=float)
+            merged = np.sort(np.concatenate([self._prices.get(key, np.empty(0)), prices]))
+            self._prices[key] = merged
+            weeks = self._weekly.setdefault((zipcode, bedroom), {})
+            old_count = weeks.get(week, {}).get('Listings', 0)
+            weeks[week] = {
+                'Listings': old_count + len(group),
+                'Median_Price': float(np.median(merged)) if merged.size else np.nan,
+                'Mean_Price': float(merged.mean()) if merged.size else np.nan,
+            }
+
+        return len(new_rows)
+
+    def _update_listing_dates(self, df):
+        """
+        Widen each listing's first/last seen dates with the dates in the new batch.
+        """
+        batch = df.groupby(['Listing_URL', 'Query_Zip_Code', 'Bedroom']).agg(
+            First_Seen=('Query_Date', 'min'),
+            Last_Seen=('Query_Date', 'max'),
+        )
+        for (url, zipcode, bedroom), first_seen, last_seen in batch.itertuples():
+            dates = self._listing_dates.setdefault((zipcode, int(bedroom)), {})
+            if url in dates:
+                known_first, known_last = dates[url]
+                dates[url] = (min(known_first, first_seen), max(known_last, last_seen))
+            else:
+                dates[url] = (first_seen, last_seen)
+
+    def get_trends(self, zipcode, bedroom, window=4):
+        """
+        Return weekly trend lines for a ZIP code and bedroom count.
+
+        Args:
+        - zipcode (str): The ZIP code to filter the rental data.
+        - bedroom (int): The number of bedrooms to filter the rental data.
+        - window (int): Number of weeks in the rolling window. The window spans calendar
+          weeks, so weeks without listings shorten it rather than stretching it back.
+
+        Returns:
+        - pd.DataFrame: One row per week with listing volume, median/mean price,
+          a rolling median price, cumulative listing volume and median days on market.
+        """
+        with self._lock:
+            return self._get_trends(str(zipcode), int(bedroom), window)
+
+    def _get_trends(self, zipcode, bedroom, window):
+        """
+        Body of `get_trends`; callers must hold the engine lock.
+        """
+        key = (zipcode, bedroom)
+        columns = ['Listings', 'Median_Price', 'Mean_Price', 'Rolling_Median_Price',
+                   'Cumulative_Listings', 'Median_Days_On_Market']
+        if key not in self._weekly:
+            return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name='Week'))
+
+        trends = pd.DataFrame.from_dict(self._weekly[key], orient='index').sort_index()
+        trends.index = pd.DatetimeIndex(trends.index, name='Week')
+        trends['Rolling_Median_Price'] = trends['Median_Price'].rolling(f'{7 * window}D', min_periods=1).median()
+        trends['Cumulative_Listings'] = trends['Listings'].expanding().sum()
+
+        listings = pd.DataFrame(list(self._listing_dates.get(key, {}).values()),
+                                columns=['First_Seen', 'Last_Seen'])
+        days_on_market = (listings['Last_Seen'] - listings['First_Seen']).dt.days
+        first_week = listings['First_Seen'].dt.to_period('W').dt.start_time
+        trends['Median_Days_On_Market'] = days_on_market.groupby(first_week).median()
+
+        return trends[columns]
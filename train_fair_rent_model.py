@@ -0,0 +1,40 @@
+"""
+Train the fair rent model offline over the listings store and save a new versioned artifact.
+
+Usage:
+    python train_fair_rent_model.py
+    python train_fair_rent_model.py --data Data/CraigsList_Rental_Listings.csv --model-dir Models
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from src.FairRentModel import FairRentModel
+from src.RentalDataStore import file_lock
+
+DATA_FILE_PATH = "Data/CraigsList_Rental_Listings.csv"
+MODEL_DIR = "Models"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_FILE_PATH, help='Listings CSV to train on.')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='Directory for versioned model artifacts.')
+    args = parser.parse_args()
+
+    # Read under the file lock so a concurrent append from the app is never half-read
+    with file_lock(args.data):
+        df = pd.read_csv(args.data)
+
+    start = time.perf_counter()
+    model = FairRentModel.fit(df)
+    elapsed = time.perf_counter() - start
+    path = model.save(args.model_dir)
+
+    print(f"Trained on {model.params['trained_on_rows']} listings in {elapsed:.2f}s")
+    print(f"Saved model version {model.version} to {path}")
+
+
+if __name__ == "__main__":
+    main()